@@ -1,29 +1,60 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from langgraph.graph import Graph, StateGraph
-from src.utils.llm import LLMManager
-import yaml
+from src.utils.llm import LLMManager, parse_json_response
+from src.utils.config import load_config
 import logging
 import asyncio
+import functools
+import time
 
 logger = logging.getLogger(__name__)
 
+# Minimum seconds between streamed progress/token callbacks
+CALLBACK_INTERVAL = 0.1
+
+def _is_flat_list(value) -> bool:
+    return isinstance(value, list) and not any(isinstance(item, (dict, list)) for item in value)
+
+def _analysis_text(value) -> str:
+    """Render an analysis as readable text; JSON mode often nests the breakdown"""
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            label = str(key).replace('_', ' ').capitalize()
+            if isinstance(item, (dict, list)) and not _is_flat_list(item):
+                lines.append(f"{label}:\n{_analysis_text(item)}")
+            else:
+                lines.append(f"{label}: {', '.join(map(str, item)) if isinstance(item, list) else item}")
+        # Blank lines keep the sections apart when rendered as markdown
+        return "\n\n".join(lines)
+    if isinstance(value, list):
+        return "\n".join(f"- {_analysis_text(item)}" for item in value)
+    return "" if value is None else str(value)
+
 class ProcessingAgent:
     def __init__(self, config_path: str = "config/config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)['agents']['processing']
+        self.config = load_config(config_path)['agents']['processing']
         
         self.llm = LLMManager(config_path)
         self.chunk_size = self.config['chunk_size']
         self.overlap = self.config['overlap']
     
-    async def process_article(self, article: Dict, progress_callback=None) -> Dict:
-        """Process a single article with progress tracking"""
+    async def close(self):
+        """Close the LLM client"""
+        await self.llm.aclose()
+    
+    async def process_article(self, article: Dict, progress_callback=None, token_callback=None) -> Dict:
+        """Process a single article with progress tracking.
+
+        token_callback, if given, is called with the response text generated so far,
+        at most every CALLBACK_INTERVAL seconds and once more when generation ends.
+        """
         try:
             # Notify progress
             if progress_callback:
                 progress_callback("Analyzing article content...")
 
-            # Generate analysis prompt
+            # Generate a single prompt covering both the analysis and the keywords
             analysis_prompt = f"""
             Analyze this research article and provide a detailed breakdown:
             Title: {article.get('title', 'Unknown')}
@@ -35,32 +66,36 @@ class ProcessingAgent:
             3. Methodology used
             4. Potential applications
             5. Key topics/keywords
-            """
-            
-            if progress_callback:
-                progress_callback("Generating analysis...")
-            
-            analysis = await self.llm.generate_response(analysis_prompt)
             
-            # Extract keywords for tagging
-            keywords_prompt = f"""
-            Based on the analysis, extract 5-7 relevant keywords that best describe this paper.
-            Return only the keywords as a comma-separated list.
+            Also extract 5-7 relevant keywords that best describe this paper.
             
-            Analysis: {analysis}
+            Return ONLY JSON, with the whole breakdown as one plain-text string:
+            {{"analysis": "...", "keywords": ["k1", "k2", ...]}}
             """
             
             if progress_callback:
-                progress_callback("Extracting keywords...")
+                progress_callback("Generating analysis...")
             
-            keywords = await self.llm.generate_response(keywords_prompt)
+            response = ""
+            token_count = 0
+            last_callback = 0.0
+            async for chunk in self.llm.stream_response(analysis_prompt, expect_json=True):
+                response += chunk
+                token_count += 1
+                # Throttle the callbacks; each one is a UI update
+                now = time.monotonic()
+                if now - last_callback >= CALLBACK_INTERVAL:
+                    last_callback = now
+                    if progress_callback:
+                        progress_callback(f"Generating analysis... ({token_count} tokens)")
+                    if token_callback:
+                        token_callback(response)
+            if token_callback:
+                token_callback(response)
             
             processed_article = {
                 **article,
-                "analysis": {
-                    "full_analysis": analysis,
-                    "keywords": [k.strip() for k in keywords.split(",")]
-                }
+                "analysis": self._parse_analysis(response)
             }
             
             if progress_callback:
@@ -73,25 +108,111 @@ class ProcessingAgent:
                 progress_callback(f"Error: {str(e)}")
             return {**article, "error": str(e)}
     
+    def _parse_analysis(self, response: str) -> Dict:
+        """Split a fused analysis/keywords response into its two parts"""
+        data = parse_json_response(response)
+        if not isinstance(data, dict):
+            logger.warning("Failed to parse analysis response as JSON")
+            return {"full_analysis": response, "keywords": []}
+        return self._analysis_from_data(data)
+    
+    def _analysis_from_data(self, data: Dict) -> Dict:
+        keywords = data.get('keywords', [])
+        if isinstance(keywords, str):
+            keywords = keywords.split(",")
+        
+        # Hash-based de-duplication that keeps the model's keyword order
+        stripped = (str(k).strip() for k in keywords)
+        return {
+            "full_analysis": _analysis_text(data.get('analysis', '')),
+            "keywords": list(dict.fromkeys(k for k in stripped if k))
+        }
+    
+    async def _analyze_batch(self, articles: List[Dict]) -> Optional[List[Dict]]:
+        """Analyze several articles with one LLM call, or None if the response is unusable"""
+        papers = "\n".join(
+            f"""
+            Paper {idx}:
+            Title: {article.get('title', 'Unknown')}
+            Abstract: {article.get('abstract', 'No abstract available')}
+            """
+            for idx, article in enumerate(articles, 1)
+        )
+        prompt = f"""
+            Analyze each of the following {len(articles)} research articles.
+            For every paper provide the main research contributions, key findings,
+            methodology used and potential applications, and extract 5-7 relevant
+            keywords that best describe it.
+            {papers}
+            Return ONLY JSON with one entry per paper, in the same order, and each
+            analysis as one plain-text string:
+            {{"papers": [{{"analysis": "...", "keywords": ["k1", "k2", ...]}}, ...]}}
+            """
+        
+        response = await self.llm.generate_response(prompt, expect_json=True)
+        data = parse_json_response(response)
+        if isinstance(data, dict):
+            data = data.get('papers')
+        if (not isinstance(data, list) or len(data) != len(articles)
+                or not all(isinstance(item, dict) for item in data)):
+            logger.warning("Failed to parse batch analysis response, falling back to single articles")
+            return None
+        return [self._analysis_from_data(item) for item in data]
+    
     async def batch_process(self, articles: List[Dict], progress_callback=None) -> List[Dict]:
-        """Process multiple articles with progress tracking"""
-        processed = []
+        """Process multiple articles concurrently with progress tracking"""
         total = len(articles)
+        batch_size = max(1, self.config.get('batch_size', 4))
+        semaphore = asyncio.BoundedSemaphore(self.config.get('concurrency', 8))
         
-        for idx, article in enumerate(articles, 1):
-            if progress_callback:
-                progress_callback(f"Processing article {idx}/{total}")
-            
-            async def update_progress(status: str):
+        def make_callback(idx: int):
+            def update_progress(status: str):
                 if progress_callback:
                     progress_callback(f"Article {idx}/{total}: {status}")
+            return update_progress
+        
+        async def process_one(idx: int, article: Dict) -> Dict:
+            async with semaphore:
+                if progress_callback:
+                    progress_callback(f"Processing article {idx}/{total}")
+                return await self.process_article(article, make_callback(idx))
+        
+        async def process_chunk(start: int, chunk: List[Dict]) -> List[Dict]:
+            if len(chunk) > 1:
+                async with semaphore:
+                    if progress_callback:
+                        progress_callback(f"Processing articles {start}-{start + len(chunk) - 1}/{total}")
+                    analyses = await self._analyze_batch(chunk)
+                if analyses is not None:
+                    return [{**article, "analysis": analysis} for article, analysis in zip(chunk, analyses)]
             
-            result = await self.process_article(article, update_progress)
-            processed.append(result)
+            results = await asyncio.gather(
+                *(process_one(start + offset, article) for offset, article in enumerate(chunk)),
+                return_exceptions=True
+            )
+            return [
+                {**article, "error": str(result)} if isinstance(result, Exception) else result
+                for article, result in zip(chunk, results)
+            ]
+        
+        chunks = [articles[i:i + batch_size] for i in range(0, total, batch_size)]
+        results = await asyncio.gather(
+            *(process_chunk(i * batch_size + 1, chunk) for i, chunk in enumerate(chunks)),
+            return_exceptions=True
+        )
+        
+        processed = []
+        for chunk, result in zip(chunks, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing articles: {str(result)}")
+                result = [{**article, "error": str(result)} for article in chunk]
+            processed.extend(result)
         
         return processed
     
-    def create_processing_graph(self) -> Graph:
+    @functools.cached_property
+    def processing_graph(self) -> Graph:
+        """Compiled workflow graph, built once per agent"""
         workflow = StateGraph()
         
         # Define processing node
@@ -100,4 +221,7 @@ class ProcessingAgent:
         # Set entry point
         workflow.set_entry_point("process")
         
-        return workflow.compile()
\ No newline at end of file
+        return workflow.compile()
+    
+    def create_processing_graph(self) -> Graph:
+        return self.processing_graph
@@ -1,23 +1,44 @@
-from typing import Dict, List, Optional
-import yaml
-from src.utils.llm import LLMManager
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from src.utils.config import load_config
+from src.utils.llm import LLMManager, parse_json_response
+from src.utils.async_client import LoopBoundClient
 from scholarly import scholarly, ProxyGenerator
 import logging
 import bibtexparser
 import re
 from datetime import datetime
 import requests
-from bs4 import BeautifulSoup
-import arxiv
-import random
+from selectolax.lexbor import LexborHTMLParser
+import itertools
 import asyncio
+import aiohttp
 from aiohttp import ClientSession
 import backoff
+import diskcache
+import os
+import feedparser
+from urllib.parse import quote
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# arXiv Atom API endpoint, used for both searches and id lookups
+ARXIV_API_URL = "https://export.arxiv.org/api/query"
+
+# Elements that commonly hold a paper's abstract on publisher landing pages, best first
+ABSTRACT_SELECTORS = (
+    'div.abstract',
+    'div#abstract',
+    'section.abstract',
+    'p.abstract',
+    'meta[name="description"]',
+    'meta[property="og:description"]'
+)
+ABSTRACT_SELECTOR = ", ".join(ABSTRACT_SELECTORS)
+MAX_HTML_CHARS = 200_000
+MIN_PAGE_TEXT_CHARS = 300
+
 # List of user agents for rotation
 USER_AGENTS = [
     'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -26,13 +47,50 @@ USER_AGENTS = [
     'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 ]
 
+# Pre-built header dicts, rotated round-robin; treat them as read-only
+_UA_HEADERS = tuple({'User-Agent': ua} for ua in USER_AGENTS)
+_ua_iter = itertools.cycle(_UA_HEADERS)
+
+# Precompiled patterns for BibTeX fields and arXiv identifiers
+_RE_TITLE = re.compile(r'title=\{([^}]+)\}')
+_RE_AUTHOR = re.compile(r'author=\{([^}]+)\}')
+_RE_YEAR = re.compile(r'year=\{([^}]+)\}')
+_RE_JOURNAL = re.compile(r'journal=\{([^}]+)\}')
+_RE_DOI = re.compile(r'doi=\{([^}]+)\}')
+_RE_EPRINT = re.compile(r'eprint=\{([^}]+)\}')
+_RE_BIBTEX_FIELD = re.compile(r'(\w+)\s*=\s*(?:\{([^{}]*)\}|"([^"]*)")')
+_RE_BIBTEX_KEY = re.compile(r'[,{\s](\w+)\s*=')
+_RE_ARXIV_URL = re.compile(r'arxiv\.org/(?:abs|pdf)/(\d+\.\d+)')
+_RE_ARXIV_ID = re.compile(r'arXiv:(\d+\.\d+)', re.IGNORECASE)
+_RE_ARXIV_ANY = re.compile(r'arxiv\.org/(?:abs|pdf)/(\d+\.\d+)|arXiv:(\d+\.\d+)')
+
+class ScholarBlockedError(Exception):
+    """Google Scholar kept answering with a CAPTCHA"""
+
+def _abstract_rank(node) -> int:
+    """Position of the first ABSTRACT_SELECTORS entry matching node"""
+    return next(
+        (rank for rank, selector in enumerate(ABSTRACT_SELECTORS) if node.css_matches(selector)),
+        len(ABSTRACT_SELECTORS)
+    )
+
 class SearchAgent:
     def __init__(self, config_path: str = "config/config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)['agents']['search']
+        self.config = load_config(config_path)['agents']['search']
         
         self.llm = LLMManager(config_path)
         self.max_results = self.config['max_results']
+        self._http = LoopBoundClient(lambda: ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=8, keepalive_timeout=60, ttl_dns_cache=300),
+            timeout=aiohttp.ClientTimeout(total=self.config.get('timeout', 20))
+        ))
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Persistent caches for repeat arXiv lookups and abstract scrapes
+        cache_dir = self.config.get('cache_dir', '.cache')
+        self.cache_ttl = self.config.get('cache_ttl', 30 * 24 * 3600)
+        self._arxiv_cache = diskcache.Cache(os.path.join(cache_dir, 'arxiv'))
+        self._abstract_cache = diskcache.Cache(os.path.join(cache_dir, 'abstracts'))
         self._setup_scholarly()
     
     def _setup_scholarly(self):
@@ -45,8 +103,8 @@ class SearchAgent:
             if pg.FreeProxies():
                 scholarly.use_proxy(pg)
             
-            # Set random user agent
-            scholarly.set_headers({'User-Agent': random.choice(USER_AGENTS)})
+            # Rotate user agent
+            scholarly.set_headers(next(_ua_iter))
             
         except Exception as e:
             logger.error(f"Error setting up scholarly: {e}")
@@ -56,21 +114,21 @@ class SearchAgent:
         for attempt in range(max_retries):
             try:
                 # Rotate user agent
-                scholarly.set_headers({'User-Agent': random.choice(USER_AGENTS)})
+                scholarly.set_headers(next(_ua_iter))
                 
-                # Try search
-                search_query = scholarly.search_pubs(keywords)
+                # Try search; scholarly fetches the first results page synchronously
+                search_query = await asyncio.to_thread(scholarly.search_pubs, keywords)
                 return search_query
             
             except Exception as e:
                 logger.error(f"Search attempt {attempt + 1} failed: {e}")
                 if "captcha" in str(e).lower():
-                    # If we hit a captcha, try rotating proxy
-                    pg = ProxyGenerator()
-                    if pg.FreeProxies():
-                        scholarly.use_proxy(pg)
+                    # If we hit a captcha, try rotating proxy (FreeProxies probes the network)
+                    await asyncio.to_thread(self._setup_scholarly)
                 
                 if attempt == max_retries - 1:
+                    if "captcha" in str(e).lower():
+                        raise ScholarBlockedError(f"Google Scholar returned a CAPTCHA after {max_retries} attempts") from e
                     raise Exception(f"Failed to search after {max_retries} attempts")
                 
                 # Wait before retrying
@@ -78,6 +136,17 @@ class SearchAgent:
 
     def _parse_bibtex(self, bibtex_str: str) -> Dict:
         """Parse BibTeX string into a dictionary"""
+        # Single regex pass over the `field={value}` pairs covers the fields we read
+        parsed = {
+            match.group(1).lower(): (match.group(2) if match.group(2) is not None else match.group(3)).strip()
+            for match in _RE_BIBTEX_FIELD.finditer(bibtex_str)
+        }
+        # Values with nested braces or without delimiters are skipped by the regex pass
+        skipped = {key.lower() for key in _RE_BIBTEX_KEY.findall(" " + bibtex_str)} - parsed.keys()
+        if parsed.get('title') and not skipped:
+            return parsed
+        
+        # Fall back to the full parser for unusual inputs (e.g. nested braces)
         try:
             # Clean up the BibTeX string
             cleaned_bibtex = bibtex_str.strip()
@@ -87,10 +156,10 @@ class SearchAgent:
             bib_database = bibtexparser.loads(cleaned_bibtex)
             if bib_database.entries:
                 return bib_database.entries[0]
-            return {}
         except Exception as e:
             logger.error(f"Error parsing BibTeX: {e}")
-            return {}
+        # Keep what the regex pass found, as long as it identifies the paper
+        return parsed if parsed.get('title') else {}
 
     @backoff.on_exception(backoff.expo,
                          Exception,
@@ -116,15 +185,13 @@ class SearchAgent:
                 - doi: DOI (if available)
                 """
                 
-                llm_response = await self.llm.generate_response(prompt)
-                try:
-                    # Try to parse LLM response as JSON
-                    import json
-                    enhanced_data = json.loads(llm_response)
-                    return enhanced_data
-                except:
+                llm_response = await self.llm.generate_response(prompt, expect_json=True)
+                # Try to parse LLM response as JSON
+                enhanced_data = parse_json_response(llm_response)
+                if not isinstance(enhanced_data, dict):
                     logger.warning("Failed to parse LLM response as JSON")
                     return {}
+                return enhanced_data
             
             # Try to find or generate URL
             if 'doi' in parsed_data and not parsed_data.get('url'):
@@ -172,48 +239,47 @@ class SearchAgent:
             logger.error(f"Error extracting citation info: {e}")
             return {}
 
+    async def _coalesce(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """Share a single in-flight request between concurrent callers for the same key"""
+        task = self._inflight.get(key)
+        # A task left over from an earlier run's event loop cannot be awaited here
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(factory())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._inflight.get(key) is done and self._inflight.pop(key))
+        return await asyncio.shield(task)
+
     async def _fetch_arxiv_details(self, arxiv_id: str) -> Optional[Dict]:
         """Fetch detailed information from arXiv API"""
-        try:
-            search = arxiv.Search(id_list=[arxiv_id])
-            paper = next(search.results())
-            return {
-                'title': paper.title,
-                'abstract': paper.summary,
-                'authors': [author.name for author in paper.authors],
-                'url': paper.entry_id,
-                'published': paper.published.strftime('%Y-%m-%d'),
-                'doi': paper.doi if paper.doi else None,
-                'categories': paper.categories
-            }
-        except Exception as e:
-            logger.error(f"Error fetching arXiv details: {e}")
-            return None
+        # diskcache does blocking sqlite I/O, so keep it off the event loop
+        cached = await asyncio.to_thread(self._arxiv_cache.get, arxiv_id)
+        if cached is not None:
+            return cached
+        
+        async def fetch() -> Optional[Dict]:
+            try:
+                feed = feedparser.parse(await self._async_request(f"{ARXIV_API_URL}?id_list={arxiv_id}"))
+                if not feed.entries:
+                    raise ValueError(f"No arXiv entry found for {arxiv_id}")
+                details = self._parse_arxiv_entry(feed.entries[0])
+                await asyncio.to_thread(self._arxiv_cache.set, arxiv_id, details, expire=self.cache_ttl)
+                return details
+            except Exception as e:
+                logger.error(f"Error fetching arXiv details: {e}")
+                return None
+        
+        return await self._coalesce(f"arxiv:{arxiv_id}", fetch)
 
     async def _enhance_with_arxiv(self, result: Dict) -> Dict:
         """Enhance result with arXiv data if available"""
         try:
-            # Check if URL or any field contains arXiv ID
-            arxiv_patterns = [
-                r'arxiv.org/abs/(\d+\.\d+)',
-                r'arxiv.org/pdf/(\d+\.\d+)',
-                r'arXiv:(\d+\.\d+)'
-            ]
-            
+            # Check if URL or BibTeX contains arXiv ID
             arxiv_id = None
-            for pattern in arxiv_patterns:
-                # Check URL
-                if result.get('url'):
-                    match = re.search(pattern, result.get('url'))
+            for field in ('url', 'bibtex'):
+                if result.get(field):
+                    match = _RE_ARXIV_ANY.search(result[field])
                     if match:
-                        arxiv_id = match.group(1)
-                        break
-                
-                # Check BibTeX
-                if result.get('bibtex'):
-                    match = re.search(pattern, result.get('bibtex'))
-                    if match:
-                        arxiv_id = match.group(1)
+                        arxiv_id = match.group(1) or match.group(2)
                         break
             
             if arxiv_id:
@@ -234,104 +300,189 @@ class SearchAgent:
             logger.error(f"Error enhancing with arXiv: {e}")
             return result
 
+    async def _fill_publication(self, pub: Dict, semaphore: asyncio.Semaphore) -> Dict:
+        """Fetch detailed publication info without blocking the event loop"""
+        async with semaphore:
+            for retry in range(3):  # Try 3 times to get detailed publication
+                try:
+                    return await asyncio.to_thread(scholarly.fill, pub)
+                except Exception as e:
+                    if "captcha" in str(e).lower():
+                        # Rotate proxy and user agent
+                        await asyncio.to_thread(self._setup_scholarly)
+                        await asyncio.sleep(2 ** retry)
+                        continue
+                    raise e
+        raise ScholarBlockedError("Failed to get detailed publication info past the CAPTCHA")
+
+    def _collect_publications(self, search_query) -> List[Dict]:
+        """Pull up to max_results publication stubs; each page fetch blocks, so run this in a thread"""
+        pubs = []
+        for i in range(self.max_results):
+            try:
+                pubs.append(next(search_query))
+            except StopIteration:
+                break
+            except Exception as e:
+                logger.error(f"Error processing publication: {str(e)}")
+                continue
+        return pubs
+
+    async def _build_result(self, detailed_pub: Dict, keywords: List[str], formatted_keywords: str) -> Optional[Dict]:
+        """Turn a filled publication into a search result, or None if it lacks data"""
+        # Process the publication data
+        bibtex = detailed_pub.get('bdata', {}).get('bibtex', '')
+        
+        # Try Google Scholar specific parsing first
+        gs_data = self._process_google_scholar_bibtex(bibtex)
+        if gs_data and gs_data.get('title'):
+            # Successfully parsed Google Scholar BibTeX
+            result = {
+                "title": gs_data['title'],
+                "authors": gs_data['authors'],
+                "year": gs_data['year'],
+                "venue": gs_data['venue'],
+                "url": gs_data.get('url', detailed_pub.get('pub_url', '')),
+                "doi": gs_data.get('doi', ''),
+                "citations": detailed_pub.get('citedby', 0),
+                "keywords": keywords,
+                "search_date": datetime.now().isoformat(),
+                "bibtex": gs_data['raw_bibtex']
+            }
+        else:
+            # Fall back to regular parsing
+            parsed_data = await self._parse_bibtex_entry(bibtex, formatted_keywords)
+            result = {
+                "title": parsed_data.get('title', detailed_pub.get('bdata', {}).get('title', '')),
+                "abstract": parsed_data.get('abstract', ''),
+                "url": parsed_data.get('url', detailed_pub.get('pub_url', '')),
+                "year": parsed_data.get('year', detailed_pub.get('bdata', {}).get('year', '')),
+                "authors": parsed_data.get('author', detailed_pub.get('bdata', {}).get('author', [])),
+                "citations": detailed_pub.get('citedby', 0),
+                "keywords": keywords,
+                "search_date": datetime.now().isoformat(),
+                "bibtex": bibtex,
+                "venue": parsed_data.get('journal', detailed_pub.get('bdata', {}).get('venue', '')),
+                "doi": parsed_data.get('doi', '')
+            }
+        
+        # Try to enhance with arXiv data regardless of source
+        result = await self._enhance_with_arxiv(result)
+        
+        # Get abstract if missing
+        if not result.get('abstract') and result.get('url'):
+            result['abstract'] = await self._extract_abstract_with_retry(result['url'])
+        
+        # Keep result only if we have at least a title and some content
+        if result['title'] and (result.get('abstract') or result.get('url')):
+            logger.info(f"Successfully processed article: {result['title']}")
+            return result
+        logger.warning(f"Skipping article due to insufficient data")
+        return None
+
+    def _parse_arxiv_entry(self, entry) -> Dict:
+        """Convert an arXiv Atom feed entry into our result fields"""
+        arxiv_id = entry.get('id', '').rsplit('/abs/', 1)[-1]
+        return {
+            'title': " ".join(entry.get('title', '').split()),
+            'abstract': " ".join(entry.get('summary', '').split()),
+            'authors': [author.get('name', '') for author in entry.get('authors', [])],
+            'url': entry.get('id', ''),
+            'published': entry.get('published', '')[:10],
+            'doi': entry.get('arxiv_doi'),
+            'categories': [tag.get('term') for tag in entry.get('tags', [])],
+            'arxiv_id': arxiv_id
+        }
+
+    async def _search_arxiv(self, query: str, keywords: List[str]) -> List[Dict]:
+        """Search the arXiv API directly, returning results in search_articles format"""
+        try:
+            url = f"{ARXIV_API_URL}?search_query=all:{quote(query)}&max_results={self.max_results}"
+            feed = feedparser.parse(await self._async_request(url))
+        except Exception as e:
+            logger.error(f"arXiv search failed: {e}")
+            return []
+        
+        results = []
+        for entry in feed.entries:
+            paper = self._parse_arxiv_entry(entry)
+            if not paper['title']:
+                continue
+            results.append({
+                "title": paper['title'],
+                "abstract": paper['abstract'],
+                "authors": paper['authors'],
+                "year": paper['published'][:4],
+                "venue": "arXiv",
+                "url": paper['url'],
+                "doi": paper['doi'] or '',
+                "citations": 0,
+                "keywords": keywords,
+                "search_date": datetime.now().isoformat(),
+                "bibtex": '',
+                "arxiv_id": paper['arxiv_id'],
+                "categories": paper['categories'],
+                "source": 'arXiv'
+            })
+        return results
+
     async def search_articles(self, keywords: List[str]) -> List[Dict]:
         try:
             formatted_keywords = " ".join(keywords)
             logger.info(f"Searching for: {formatted_keywords}")
             
+            # Structured arXiv results avoid the Google Scholar scrape entirely
+            if self.config.get('prefer_arxiv', True):
+                results = await self._search_arxiv(formatted_keywords, keywords)
+                if results:
+                    return results
+                logger.info("No arXiv results, falling back to Google Scholar")
+            
             # Use retry mechanism for searching
             try:
                 search_query = await self._retry_search(formatted_keywords)
+            except ScholarBlockedError:
+                raise
             except Exception as e:
                 logger.error(f"Search failed completely: {e}")
                 return []
             
-            results = []
+            # Collect the publication stubs first; filling them is done concurrently
+            pubs = await asyncio.to_thread(self._collect_publications, search_query)
+            logger.info(f"Processing {len(pubs)} publications")
             
-            for i in range(self.max_results):
-                try:
-                    pub = next(search_query)
-                    logger.info(f"Processing publication {i+1}/{self.max_results}")
-                    
-                    # Get the citation in BibTeX format with retries
-                    try:
-                        detailed_pub = None
-                        for retry in range(3):  # Try 3 times to get detailed publication
-                            try:
-                                detailed_pub = scholarly.fill(pub)
-                                break
-                            except Exception as e:
-                                if "captcha" in str(e).lower():
-                                    # Rotate proxy and user agent
-                                    self._setup_scholarly()
-                                    await asyncio.sleep(2 ** retry)
-                                    continue
-                                raise e
-                        
-                        if not detailed_pub:
-                            raise Exception("Failed to get detailed publication info")
-                        
-                        # Process the publication data
-                        bibtex = detailed_pub.get('bdata', {}).get('bibtex', '')
-                        
-                        # Try Google Scholar specific parsing first
-                        gs_data = self._process_google_scholar_bibtex(bibtex)
-                        if gs_data and gs_data.get('title'):
-                            # Successfully parsed Google Scholar BibTeX
-                            result = {
-                                "title": gs_data['title'],
-                                "authors": gs_data['authors'],
-                                "year": gs_data['year'],
-                                "venue": gs_data['venue'],
-                                "url": gs_data.get('url', detailed_pub.get('pub_url', '')),
-                                "doi": gs_data.get('doi', ''),
-                                "citations": detailed_pub.get('citedby', 0),
-                                "keywords": keywords,
-                                "search_date": datetime.now().isoformat(),
-                                "bibtex": gs_data['raw_bibtex']
-                            }
-                        else:
-                            # Fall back to regular parsing
-                            parsed_data = await self._parse_bibtex_entry(bibtex, formatted_keywords)
-                            result = {
-                                "title": parsed_data.get('title', detailed_pub.get('bdata', {}).get('title', '')),
-                                "abstract": parsed_data.get('abstract', ''),
-                                "url": parsed_data.get('url', detailed_pub.get('pub_url', '')),
-                                "year": parsed_data.get('year', detailed_pub.get('bdata', {}).get('year', '')),
-                                "authors": parsed_data.get('author', detailed_pub.get('bdata', {}).get('author', [])),
-                                "citations": detailed_pub.get('citedby', 0),
-                                "keywords": keywords,
-                                "search_date": datetime.now().isoformat(),
-                                "bibtex": bibtex,
-                                "venue": parsed_data.get('journal', detailed_pub.get('bdata', {}).get('venue', '')),
-                                "doi": parsed_data.get('doi', '')
-                            }
-                        
-                        # Try to enhance with arXiv data regardless of source
-                        result = await self._enhance_with_arxiv(result)
-                        
-                        # Get abstract if missing
-                        if not result.get('abstract') and result.get('url'):
-                            result['abstract'] = await self._extract_abstract_with_retry(result['url'])
-                        
-                        # Add result only if we have at least a title and some content
-                        if result['title'] and (result.get('abstract') or result.get('url')):
-                            results.append(result)
-                            logger.info(f"Successfully processed article: {result['title']}")
-                        else:
-                            logger.warning(f"Skipping article due to insufficient data")
-                    
-                    except Exception as e:
-                        logger.error(f"Error processing detailed publication: {str(e)}")
-                        continue
-                    
-                except StopIteration:
-                    break
-                except Exception as e:
-                    logger.error(f"Error processing publication: {str(e)}")
-                    continue
+            # Bound concurrent Google Scholar requests to stay clear of rate limits
+            semaphore = asyncio.Semaphore(self.config.get('fill_concurrency', 4))
+            detailed_pubs = await asyncio.gather(
+                *(self._fill_publication(pub, semaphore) for pub in pubs),
+                return_exceptions=True
+            )
+            
+            filled = []
+            for detailed_pub in detailed_pubs:
+                if isinstance(detailed_pub, Exception):
+                    logger.error(f"Error processing detailed publication: {str(detailed_pub)}")
+                elif detailed_pub:
+                    filled.append(detailed_pub)
+            if not filled and any(isinstance(pub, ScholarBlockedError) for pub in detailed_pubs):
+                raise ScholarBlockedError("Google Scholar blocked every publication request")
+            
+            built = await asyncio.gather(
+                *(self._build_result(pub, keywords, formatted_keywords) for pub in filled),
+                return_exceptions=True
+            )
+            
+            results = []
+            for result in built:
+                if isinstance(result, Exception):
+                    logger.error(f"Error processing detailed publication: {str(result)}")
+                elif result:
+                    results.append(result)
             
             return results
+        except ScholarBlockedError:
+            # Callers stop queuing Scholar searches once they see this
+            raise
         except Exception as e:
             logger.error(f"Error in search_articles: {str(e)}")
             return []
@@ -340,7 +491,7 @@ class SearchAgent:
         """Extract abstract from URL with retries"""
         for attempt in range(max_retries):
             try:
-                headers = {'User-Agent': random.choice(USER_AGENTS)}
+                headers = next(_ua_iter)
                 return await self._extract_abstract_from_url(url, headers)
             except Exception as e:
                 logger.error(f"Error extracting abstract (attempt {attempt + 1}): {e}")
@@ -349,74 +500,105 @@ class SearchAgent:
                 continue
         return ""
 
+    async def close(self):
+        """Close the shared HTTP session and LLM client"""
+        await self._http.aclose()
+        await self.llm.aclose()
+
     @backoff.on_exception(backoff.expo,
                          Exception,
                          max_tries=3)
     async def _async_request(self, url: str, headers: Dict = None) -> str:
         """Make async HTTP request with retries"""
         if headers is None:
-            headers = {'User-Agent': random.choice(USER_AGENTS)}
+            headers = next(_ua_iter)
         
-        async with ClientSession() as session:
-            async with session.get(url, headers=headers) as response:
-                return await response.text()
+        session = self._http.get()
+        async with session.get(url, headers=headers) as response:
+            return await response.text()
 
     async def _extract_abstract_from_url(self, url: str, headers: Dict = None) -> str:
-        """Extract abstract from publication URL using async requests"""
+        """Extract abstract from publication URL, reusing previously extracted abstracts"""
+        cached = await asyncio.to_thread(self._abstract_cache.get, url)
+        if cached is not None:
+            return cached
+        
+        async def scrape() -> str:
+            abstract, page_text = await self._scrape_abstract(url, headers)
+            if abstract:
+                # Only abstracts taken from arXiv or the page itself are cached; LLM output is not
+                await asyncio.to_thread(self._abstract_cache.set, url, abstract, expire=self.cache_ttl)
+                return abstract
+            return await self._abstract_from_page_text(page_text)
+        
+        return await self._coalesce(f"abstract:{url}", scrape)
+
+    async def _scrape_abstract(self, url: str, headers: Dict = None) -> Tuple[str, str]:
+        """Extract abstract from publication URL using async requests.
+
+        Returns the abstract, or "" and the page's main text when no abstract element was found.
+        """
         try:
             # Check if it's an arXiv paper
-            arxiv_id_match = re.search(r'arxiv.org/abs/(\d+\.\d+)', url)
+            arxiv_id_match = _RE_ARXIV_URL.search(url)
             if arxiv_id_match:
-                arxiv_id = arxiv_id_match.group(1)
-                search = arxiv.Search(id_list=[arxiv_id])
-                paper = next(search.results())
-                return paper.summary
+                details = await self._fetch_arxiv_details(arxiv_id_match.group(1))
+                if details and details.get('abstract'):
+                    return details['abstract'], ""
 
             # For other URLs, try to extract from webpage
             if headers is None:
-                headers = {'User-Agent': random.choice(USER_AGENTS)}
+                headers = next(_ua_iter)
             
             html = await self._async_request(url, headers)
-            soup = BeautifulSoup(html, 'html.parser')
+            # Abstracts sit near the top of the page; skip parsing the rest
+            tree = LexborHTMLParser(html[:MAX_HTML_CHARS])
             
-            # Common abstract selectors
-            abstract_selectors = [
-                'div.abstract',
-                'div#abstract',
-                'section.abstract',
-                'p.abstract',
-                'meta[name="description"]',
-                'meta[property="og:description"]'
-            ]
+            # Common abstract selectors, matched in a single tree traversal and tried
+            # in priority order (the <head> description would otherwise always win)
+            for node in sorted(tree.css(ABSTRACT_SELECTOR), key=_abstract_rank):
+                if node.tag == 'meta':
+                    content = node.attributes.get('content') or ''
+                else:
+                    content = node.text(separator=' ', strip=True)
+                if content.strip():
+                    return content.strip(), ""
             
-            for selector in abstract_selectors:
-                elements = soup.select(selector)
-                if elements:
-                    content = elements[0].get_text() if not elements[0].get('content') else elements[0]['content']
-                    return content.strip()
-            
-            # If no abstract found, use LLM to find it
-            prompt = f"""
-            Given this webpage content, find and extract ONLY the research paper's abstract.
-            If you can't find a clear abstract, return an empty string.
-            
-            Webpage content:
-            {soup.get_text()[:2000]}  # First 2000 chars should be enough
-            """
-            
-            abstract = await self.llm.generate_response(prompt)
-            return abstract.strip()
+            content_node = tree.css_first('main') or tree.css_first('article') or tree.body
+            page_text = content_node.text(separator=' ', strip=True) if content_node is not None else ''
+            return "", page_text
             
         except Exception as e:
             logger.error(f"Error extracting abstract from URL {url}: {e}")
             raise
 
+    async def _abstract_from_page_text(self, page_text: str) -> str:
+        """Ask the LLM to find the abstract in a page's text, unless the page has no real content"""
+        if len(page_text) <= MIN_PAGE_TEXT_CHARS:
+            return ""
+        
+        page_text = page_text[:2000]
+        prompt = f"""
+        Given this webpage content, find and extract ONLY the research paper's abstract.
+        If you can't find a clear abstract, return an empty string.
+        
+        Webpage content:
+        {page_text}
+        """
+        
+        abstract = (await self.llm.generate_response(prompt)).strip()
+        # LLMManager reports failures as "Error..." text; never use that as an abstract
+        if abstract.startswith("Error"):
+            logger.error(f"LLM abstract extraction failed: {abstract}")
+            return ""
+        return abstract
+
     async def process_results(self, results: List[Dict]) -> List[Dict]:
         """Process and enrich the search results with LLM analysis"""
-        processed_results = []
+        semaphore = asyncio.BoundedSemaphore(self.config.get('concurrency', 8))
         
-        for result in results:
-            try:
+        async def process_one(result: Dict) -> Dict:
+            async with semaphore:
                 analysis_prompt = f"""
                 Analyze this research article and extract key information:
                 Title: {result['title']}
@@ -429,13 +611,20 @@ class SearchAgent:
                 4. Potential applications
                 """
                 
-                analysis = await self.llm.generate_response(analysis_prompt)
-                result['analysis'] = analysis
-                processed_results.append(result)
-            except Exception as e:
-                print(f"Error processing result {result.get('title', '')}: {str(e)}")
+                result['analysis'] = await self.llm.generate_response(analysis_prompt)
+                return result
+        
+        processed = await asyncio.gather(
+            *(process_one(result) for result in results),
+            return_exceptions=True
+        )
+        
+        processed_results = []
+        for result, outcome in zip(results, processed):
+            if isinstance(outcome, Exception):
+                print(f"Error processing result {result.get('title', '')}: {str(outcome)}")
                 result['analysis'] = "Error during analysis"
-                processed_results.append(result)
+            processed_results.append(result)
         
         return processed_results
 
@@ -448,10 +637,10 @@ class SearchAgent:
                 return {}
 
             # Extract key components using regex
-            title_match = re.search(r'title={([^}]+)}', bibtex_str)
-            author_match = re.search(r'author={([^}]+)}', bibtex_str)
-            year_match = re.search(r'year={([^}]+)}', bibtex_str)
-            journal_match = re.search(r'journal={([^}]+)}', bibtex_str)
+            title_match = _RE_TITLE.search(bibtex_str)
+            author_match = _RE_AUTHOR.search(bibtex_str)
+            year_match = _RE_YEAR.search(bibtex_str)
+            journal_match = _RE_JOURNAL.search(bibtex_str)
             
             # Build result dictionary
             result = {
@@ -463,13 +652,13 @@ class SearchAgent:
             }
 
             # Extract any DOI or URL if present
-            doi_match = re.search(r'doi={([^}]+)}', bibtex_str)
+            doi_match = _RE_DOI.search(bibtex_str)
             if doi_match:
                 result['doi'] = doi_match.group(1)
                 result['url'] = f"https://doi.org/{doi_match.group(1)}"
             
             # Extract arXiv identifier if present
-            arxiv_match = re.search(r'eprint={([^}]+)}', bibtex_str) or re.search(r'arxiv:(\d+\.\d+)', bibtex_str, re.IGNORECASE)
+            arxiv_match = _RE_EPRINT.search(bibtex_str) or _RE_ARXIV_ID.search(bibtex_str)
             if arxiv_match:
                 result['arxiv_id'] = arxiv_match.group(1)
                 result['url'] = f"https://arxiv.org/abs/{arxiv_match.group(1)}"
@@ -1,17 +1,29 @@
-from typing import Dict, List
+from typing import Dict, List, Optional
 from langgraph.graph import Graph, StateGraph
-from src.utils.zotero_connector import ZoteroConnector
-import yaml
+from src.utils.config import load_config
+from src.utils.zotero_connector import AsyncZoteroConnector, ZoteroConnector
+import asyncio
+import functools
+
+# Limits for deriving tags from free-text analyses
+MAX_ANALYSIS_WORDS = 512
+MAX_ANALYSIS_TAGS = 5
 
 class ZoteroAgent:
     def __init__(self, config_path: str = "config/config.yaml"):
-        with open(config_path, 'r') as f:
-            config = yaml.safe_load(f)
-            self.config = config['zotero']
+        self.config = load_config(config_path)['zotero']
+        self._base_tags = frozenset(self.config['auto_tags'])
         
+        # The sync connector supplies item templates; writes go through the async client
         self.zotero = ZoteroConnector(config_path)
+        self.async_zotero = AsyncZoteroConnector(config_path)
     
-    async def save_article(self, article_data: Dict) -> Dict:
+    async def close(self):
+        """Close the Zotero HTTP client"""
+        await self.async_zotero.aclose()
+    
+    def _prepare_item(self, article_data: Dict) -> Optional[Dict]:
+        """Collect the Zotero item fields for an article, or None if it cannot be saved"""
         # Validate required fields
         title = article_data.get('title', '').strip()
         abstract = article_data.get('abstract', '').strip()
@@ -19,61 +31,97 @@ class ZoteroAgent:
         
         # Skip articles with missing essential data
         if not title:
-            return {
-                **article_data,
-                "saved_to_zotero": False,
-                "error": "Missing title"
-            }
+            return None
             
         if not abstract:
             abstract = "No abstract available"
             
         # Extract keywords from analysis if available
-        tags = self.config['auto_tags']
-        if 'analysis' in article_data:
-            # Add keywords from the analysis
+        tags = set(self._base_tags)
+        analysis = article_data.get('analysis')
+        if isinstance(analysis, dict):
+            # ProcessingAgent output: use the keywords the model extracted
+            candidates = (str(k).strip() for k in analysis.get('keywords') or [])
+        elif isinstance(analysis, str):
+            # Free-text analysis (process_results): relevant terms from its start
+            candidates = (word for word in analysis.lower().split(None, MAX_ANALYSIS_WORDS)[:MAX_ANALYSIS_WORDS]
+                          if len(word) > 3)
+        else:
+            candidates = ()
+        
+        # Add up to 5 of them as tags
+        added = 0
+        for candidate in candidates:
+            if candidate and candidate not in tags:
+                tags.add(candidate)
+                added += 1
+                if added == MAX_ANALYSIS_TAGS:
+                    break
+        
+        return {
+            'title': title,
+            'abstract': abstract,
+            'url': url,
+            'tags': list(tags)
+        }
+    
+    async def save_article(self, article_data: Dict) -> Dict:
+        return (await self.batch_save([article_data]))[0]
+    
+    async def batch_save(self, processed_articles: List[Dict]) -> List[Dict]:
+        saved_articles: List[Optional[Dict]] = [None] * len(processed_articles)
+        pending = []
+        for idx, article in enumerate(processed_articles):
             try:
-                # Extract potential keywords from the analysis
-                analysis_text = article_data['analysis']
-                if isinstance(analysis_text, str) and analysis_text.strip():
-                    # Use LLM to extract keywords if available
-                    tags.extend([
-                        tag.strip() 
-                        for tag in analysis_text.lower().split() 
-                        if len(tag.strip()) > 3
-                    ][:5])  # Add up to 5 relevant terms as tags
+                item = self._prepare_item(article)
             except Exception as e:
-                print(f"Error extracting keywords from analysis: {e}")
+                print(f"Failed to prepare article '{article.get('title', '')}': {str(e)}")
+                saved_articles[idx] = {
+                    **article,
+                    "saved_to_zotero": False,
+                    "error": str(e)
+                }
+                continue
+            
+            if item is None:
+                saved_articles[idx] = {
+                    **article,
+                    "saved_to_zotero": False,
+                    "error": "Missing title"
+                }
+            else:
+                pending.append((idx, item))
+        
+        if not pending:
+            return saved_articles
         
         try:
-            saved_item = self.zotero.create_item(
-                title=title,
-                abstract=abstract,
-                url=url,
-                tags=list(set(tags))  # Remove duplicate tags
-            )
-            
-            return {
-                **article_data,
-                "zotero_key": saved_item.get('key'),
-                "saved_to_zotero": True
-            }
+            templates = await asyncio.to_thread(self.zotero.build_items, [item for _, item in pending])
+            created = await self.async_zotero.create_items_batch(templates)
         except Exception as e:
-            print(f"Failed to save article '{title}': {str(e)}")
-            return {
-                **article_data,
-                "saved_to_zotero": False,
-                "error": str(e)
-            }
-    
-    async def batch_save(self, processed_articles: List[Dict]) -> List[Dict]:
-        saved_articles = []
-        for article in processed_articles:
-            saved = await self.save_article(article)
-            saved_articles.append(saved)
+            created = [{'error': str(e)}] * len(pending)
+        
+        for (idx, _), result in zip(pending, created):
+            article = processed_articles[idx]
+            if 'error' in result:
+                print(f"Failed to save article '{article.get('title', '')}': {result['error']}")
+                saved_articles[idx] = {
+                    **article,
+                    "saved_to_zotero": False,
+                    "error": result['error']
+                }
+            else:
+                saved_articles[idx] = {
+                    **article,
+                    "zotero_key": result.get('key'),
+                    "saved_to_zotero": True
+                }
+        
         return saved_articles
     
-    def create_zotero_graph(self) -> Graph:
+    @functools.cached_property
+    def zotero_graph(self) -> Graph:
+        """Compiled workflow graph, built once per agent"""
         workflow = StateGraph()
         
         # Define Zotero interaction nodes
@@ -82,4 +130,7 @@ class ZoteroAgent:
         # Set entry point
         workflow.set_entry_point("save_to_zotero")
         
-        return workflow.compile()
\ No newline at end of file
+        return workflow.compile()
+    
+    def create_zotero_graph(self) -> Graph:
+        return self.zotero_graph
@@ -1,9 +1,11 @@
 import streamlit as st
 import asyncio
-from src.agents.search_agent import SearchAgent
+import gc
+from src.agents.search_agent import ScholarBlockedError, SearchAgent
 from src.agents.processing_agent import ProcessingAgent
 from src.agents.zotero_agent import ZoteroAgent
-import yaml
+from src.utils.config import load_config
+from src.utils.llm import LLMManager
 import time
 
 # Initialize session state
@@ -23,6 +25,18 @@ if 'total_operations' not in st.session_state:
     st.session_state.total_operations = 0
 if 'completion_status' not in st.session_state:
     st.session_state.completion_status = {}
+if 'rerun_count' not in st.session_state:
+    st.session_state.rerun_count = 0
+
+# Keep session memory bounded across long sessions
+MAX_STORED_ARTICLES = 200
+FULL_GC_EVERY = 50
+# Articles processed between longer pauses that let the UI repaint
+YIELD_EVERY = 10
+
+st.session_state.rerun_count += 1
+if st.session_state.rerun_count % FULL_GC_EVERY == 0:
+    gc.collect()
 
 def update_status(message: str, is_error: bool = False):
     st.session_state.current_status = message
@@ -50,17 +64,199 @@ def update_operation_status(operation: str, status: str, total: int = None):
         progress = len([s for s in st.session_state.completion_status.values() if s == "completed"]) / total
         overall_progress.progress(progress)
 
+def render_article(saved: dict, label: str, slot):
+    """Render a processed article into its slot"""
+    with slot.container():
+        with st.expander(f"📄 {saved.get('title', 'Untitled')} ({label})", expanded=True):
+            if saved.get('saved_to_zotero'):
+                st.success("✅ Saved to Zotero")
+                
+                # Display article details, one pre-formatted block per column
+                analysis = saved.get('analysis') if isinstance(saved.get('analysis'), dict) else {}
+                details = ["**Abstract:**", saved.get('abstract', 'No abstract available')]
+                if analysis:
+                    details += ["**Analysis:**", analysis.get('full_analysis', '')]
+                
+                info = [
+                    "**Info:**",
+                    f"**Year:** {saved.get('year', 'N/A')}",
+                    f"**Citations:** {saved.get('citations', 'N/A')}"
+                ]
+                if saved.get('url'):
+                    info.append(f"[View Article]({saved['url']})")
+                if analysis.get('keywords'):
+                    info += ["**Keywords:**", ", ".join(analysis['keywords'])]
+                
+                col1, col2 = st.columns([3, 1])
+                col1.markdown("\n\n".join(details))
+                col2.markdown("\n\n".join(info))
+            else:
+                st.error("❌ Failed to save to Zotero")
+                if 'error' in saved:
+                    st.error(f"Error: {saved['error']}")
+
+def article_row(saved: dict, label: str) -> dict:
+    """Summarize a processed article as one row of the results table"""
+    analysis = saved.get('analysis') if isinstance(saved.get('analysis'), dict) else {}
+    return {
+        "#": label,
+        "Title": saved.get('title', 'Untitled'),
+        "Year": str(saved.get('year', '')),
+        "Citations": saved.get('citations', 0),
+        "Keywords": ", ".join(analysis.get('keywords', [])),
+        "Saved": "✅" if saved.get('saved_to_zotero') else f"❌ {saved.get('error', '')}",
+        "URL": saved.get('url', '')
+    }
+
+async def run_pipeline(keyword_list: tuple) -> list:
+    """Search all keywords, process every result concurrently and save each keyword's batch at once"""
+    total = len(keyword_list)
+    # Cap concurrent LLM work across all articles
+    semaphore = asyncio.Semaphore(8)
+    processed_count = 0
+    
+    async def process(result: dict):
+        nonlocal processed_count
+        async with semaphore:
+            # Stream the analysis into the article's slot while it is generated
+            slot = results_container.empty()
+            title = result.get('title', 'Untitled')
+            
+            def show_tokens(text: str):
+                slot.markdown(f"**📄 {title}**\n\n{text}")
+            
+            processed = await processing_agent.process_article(result, token_callback=show_tokens)
+        
+        # Yield to the other tasks after the parsing work, and pause a little longer every few articles
+        processed_count += 1
+        await asyncio.sleep(0.01 if processed_count % YIELD_EVERY == 0 else 0)
+        return slot, processed
+    
+    async def handle_keyword(idx: int, search_results: list):
+        processed = await asyncio.gather(*(process(result) for result in search_results))
+        # One bulk Zotero write per keyword instead of one request per article
+        saved = await zotero_agent.batch_save([article for _, article in processed])
+        return idx, [(slot, article) for (slot, _), article in zip(processed, saved)]
+    
+    # Few concurrent Scholar queries keep us clear of CAPTCHAs; stop queuing new ones once blocked
+    search_semaphore = asyncio.Semaphore(2)
+    blocked = asyncio.Event()
+    searched = 0
+    
+    async def search(idx: int, keyword: str):
+        nonlocal searched
+        async with search_semaphore:
+            if blocked.is_set():
+                return None
+            try:
+                return await search_agent.search_articles([keyword])
+            except ScholarBlockedError:
+                blocked.set()
+                raise
+            finally:
+                searched += 1
+                st.session_state.completion_status[f"Keyword {idx}"] = "completed"
+                update_operation_status("Searching", f"{searched}/{total} keywords searched", total)
+    
+    try:
+        update_operation_status("Searching", f"Searching {total} keywords", total)
+        searches = await asyncio.gather(
+            *(search(idx, keyword) for idx, keyword in enumerate(keyword_list, 1)),
+            return_exceptions=True
+        )
+        if blocked.is_set():
+            st.error("⚠️ Google Scholar is blocking requests. Please wait a few minutes.")
+        
+        tasks = []
+        for idx, (keyword, search_results) in enumerate(zip(keyword_list, searches), 1):
+            if search_results is None:
+                continue
+            if isinstance(search_results, Exception):
+                # A CAPTCHA block is reported once above
+                if not isinstance(search_results, ScholarBlockedError):
+                    st.error(f"Error searching for '{keyword}': {str(search_results)}")
+            elif search_results:
+                tasks.append(handle_keyword(idx, search_results))
+            else:
+                st.warning(f"No results found for '{keyword}'")
+        
+        # Display each keyword's articles as soon as they have been processed and saved
+        all_results = []
+        for done, next_keyword in enumerate(asyncio.as_completed(tasks), 1):
+            if st.session_state.stop_search:
+                update_operation_status("Search", "stopped")
+                break
+            
+            try:
+                idx, articles = await next_keyword
+            except Exception as e:
+                st.error(f"Error processing articles: {str(e)}")
+                continue
+            
+            update_operation_status("Processing", f"Keyword {done}/{len(tasks)} saved")
+            for slot, saved in articles:
+                render_article(saved, f"{idx}/{total}", slot)
+                all_results.append(saved)
+                # Keep a summary row so later reruns can redisplay the results without searching
+                st.session_state.processed_articles.append(article_row(saved, f"{idx}/{total}"))
+        
+        return all_results
+    finally:
+        await search_agent.close()
+        await processing_agent.close()
+        await zotero_agent.close()
+
+@st.cache_resource
+def get_config():
+    return load_config("config/config.yaml")
+
+def get_agents():
+    """Build the agents once per session instead of on every rerun.
+
+    They hold HTTP clients bound to the session's event loop, so they are not shared process-wide.
+    """
+    if 'agents' not in st.session_state:
+        st.session_state.agents = (SearchAgent(), ProcessingAgent(), ZoteroAgent())
+    return st.session_state.agents
+
+@st.cache_resource(ttl=60)
+def check_ollama() -> bool:
+    """Probe the ollama service once at load time, for the startup banner"""
+    llm = LLMManager()
+    
+    async def probe():
+        try:
+            return await llm._check_ollama_service()
+        finally:
+            await llm.aclose()
+    return asyncio.run(probe())
+
+@st.cache_data(ttl=60)
+def load_saved_articles(collection_name: str) -> list:
+    """Fetch the collection's items, reusing the result for repeated clicks"""
+    async def fetch():
+        try:
+            return await zotero_agent.async_zotero.get_collection_items(collection_name)
+        finally:
+            await zotero_agent.close()
+    return asyncio.run(fetch())
+
+@st.cache_data
+def parse_keywords(raw: str) -> tuple[str, ...]:
+    """Split the keyword text into stripped, non-empty lines"""
+    return tuple(k for k in (line.strip() for line in raw.splitlines()) if k)
+
 # Load configuration
-with open("config/config.yaml", "r") as f:
-    config = yaml.safe_load(f)
+config = get_config()
 
 # Initialize agents
-search_agent = SearchAgent()
-processing_agent = ProcessingAgent()
-zotero_agent = ZoteroAgent()
+search_agent, processing_agent, zotero_agent = get_agents()
 
 st.title("Research AI Assistant")
 
+if not check_ollama():
+    st.warning("⚠️ Ollama service is not running. Please start ollama first.")
+
 # Create sidebar for settings
 with st.sidebar:
     st.header("Settings")
@@ -117,94 +313,11 @@ if search_button and keywords:
     
     try:
         # Convert keywords to list
-        keyword_list = [k.strip() for k in keywords.split("\n") if k.strip()]
+        keyword_list = parse_keywords(keywords)
         st.session_state.total_operations = len(keyword_list)
         
-        all_results = []
-        
-        for idx, keyword in enumerate(keyword_list, 1):
-            if st.session_state.stop_search:
-                update_operation_status("Search", "stopped")
-                break
-            
-            # Update status for current keyword
-            update_operation_status(
-                "Searching",
-                f"Processing '{keyword}' ({idx}/{len(keyword_list)})",
-                len(keyword_list)
-            )
-            
-            # Search for articles
-            try:
-                search_results = asyncio.run(search_agent.search_articles([keyword]))
-                
-                if search_results:
-                    # Process each result in real-time
-                    for result_idx, result in enumerate(search_results, 1):
-                        if st.session_state.stop_search:
-                            break
-                            
-                        update_operation_status(
-                            "Processing",
-                            f"Article {result_idx}/{len(search_results)} for '{keyword}'"
-                        )
-                        
-                        try:
-                            # Process and save article
-                            processed = asyncio.run(processing_agent.process_article(result))
-                            saved = asyncio.run(zotero_agent.save_article(processed))
-                            
-                            # Display result immediately
-                            with results_container:
-                                with st.expander(
-                                    f"📄 {saved.get('title', 'Untitled')} ({idx}/{len(keyword_list)})", 
-                                    expanded=True
-                                ):
-                                    if saved.get('saved_to_zotero'):
-                                        st.success("✅ Saved to Zotero")
-                                        
-                                        # Display article details
-                                        col1, col2 = st.columns([3, 1])
-                                        with col1:
-                                            st.markdown("**Abstract:**")
-                                            st.markdown(saved.get('abstract', 'No abstract available'))
-                                            if isinstance(saved.get('analysis'), dict):
-                                                st.markdown("**Analysis:**")
-                                                st.markdown(saved['analysis'].get('full_analysis', ''))
-                                        with col2:
-                                            st.markdown("**Info:**")
-                                            st.markdown(f"**Year:** {saved.get('year', 'N/A')}")
-                                            st.markdown(f"**Citations:** {saved.get('citations', 'N/A')}")
-                                            if saved.get('url'):
-                                                st.markdown(f"[View Article]({saved['url']})")
-                                            if saved.get('analysis', {}).get('keywords'):
-                                                st.markdown("**Keywords:**")
-                                                st.markdown(", ".join(saved['analysis']['keywords']))
-                                    else:
-                                        st.error("❌ Failed to save to Zotero")
-                                        if 'error' in saved:
-                                            st.error(f"Error: {saved['error']}")
-                            
-                            all_results.append(saved)
-                            
-                        except Exception as e:
-                            st.error(f"Error processing article: {str(e)}")
-                            if not retry_on_error:
-                                continue
-                else:
-                    st.warning(f"No results found for '{keyword}'")
-            
-            except Exception as e:
-                if "captcha" in str(e).lower():
-                    st.error("⚠️ Google Scholar is blocking requests. Please wait a few minutes.")
-                    break
-                else:
-                    st.error(f"Error searching for '{keyword}': {str(e)}")
-                if not retry_on_error:
-                    continue
-            
-            # Mark operation as completed
-            st.session_state.completion_status[f"Keyword {idx}"] = "completed"
+        # Debug mode reports any callback that blocks the loop for more than 100ms
+        all_results = asyncio.run(run_pipeline(keyword_list), debug=config.get('debug', False))
         
         # Show final summary
         if all_results:
@@ -227,12 +340,26 @@ if search_button and keywords:
         st.session_state.stop_search = False
         overall_progress.empty()
         current_article_status.empty()
+        
+        # Release this run's results and trim what the session keeps around
+        all_results = None
+        st.session_state.processed_articles = st.session_state.processed_articles[-MAX_STORED_ARTICLES:]
+        gc.collect(1)
+
+elif st.session_state.processed_articles:
+    # Widget interactions rerun the script; redisplay the last results as a single table
+    # instead of one expander per article
+    results_container.dataframe(
+        st.session_state.processed_articles,
+        use_container_width=True,
+        hide_index=True
+    )
 
 # Zotero Management section at the bottom
 st.header("📚 Saved Articles")
 if st.button("View Saved Articles"):
     with st.spinner("Loading saved articles..."):
-        saved_articles = zotero_agent.zotero.get_collection_items()
+        saved_articles = load_saved_articles(config['zotero']['collection_name'])
         
         if not saved_articles:
             st.info("No articles found in Zotero collection")
@@ -1,4 +1,5 @@
-from .llm import LLMManager
+from .config import load_config
+from .llm import LLMManager, parse_json_response
 from .zotero_connector import ZoteroConnector
 
-__all__ = ['LLMManager', 'ZoteroConnector']
\ No newline at end of file
+__all__ = ['LLMManager', 'ZoteroConnector', 'load_config', 'parse_json_response']
\ No newline at end of file
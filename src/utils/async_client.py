@@ -0,0 +1,34 @@
+from typing import Any, Callable, Optional
+import asyncio
+
+class LoopBoundClient:
+    """Lazily built async HTTP client (httpx.AsyncClient or aiohttp.ClientSession).
+
+    Clients hold connections bound to the event loop that created them, and each app
+    run uses a fresh loop, so the client is rebuilt whenever the running loop changes.
+    """
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._client: Optional[Any] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @staticmethod
+    def _is_closed(client) -> bool:
+        # httpx exposes is_closed, aiohttp closed
+        return getattr(client, 'is_closed', None) or getattr(client, 'closed', False)
+
+    def get(self) -> Any:
+        """Return the client for the running event loop, creating it if needed"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._is_closed(self._client) or self._loop is not loop:
+            self._client = self._factory()
+            self._loop = loop
+        return self._client
+
+    async def aclose(self):
+        """Close the current client"""
+        if self._client is not None and not self._is_closed(self._client):
+            close = getattr(self._client, 'aclose', None) or self._client.close
+            await close()
+        self._client = None
+        self._loop = None
@@ -0,0 +1,19 @@
+import functools
+import os
+from typing import Dict
+import yaml
+
+# Prefer the libyaml C loader when PyYAML was built with it
+_Loader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+@functools.lru_cache(maxsize=8)
+def _load_config(path: str, mtime: float) -> Dict:
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=_Loader)
+
+def load_config(config_path: str = "config/config.yaml") -> Dict:
+    """Load a YAML config file, reusing the parsed result until the file changes.
+
+    The returned dict is shared between callers and must not be mutated.
+    """
+    return _load_config(config_path, os.path.getmtime(config_path))
@@ -1,12 +1,15 @@
 import ollama
-from typing import Dict, Any, List
-import yaml
+from typing import Dict, Any, AsyncIterator, List, Optional
+from src.utils.config import load_config
+from src.utils.async_client import LoopBoundClient
 import logging
 import time
-import json
+import orjson
 import httpx
 import asyncio
-from datetime import datetime, timedelta
+import re
+import threading
+import weakref
 from pathlib import Path
 
 # Configure logging
@@ -16,58 +19,160 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+OLLAMA_URL = "http://localhost:11434"
+JSON_HEADERS = {"Content-Type": "application/json"}
+# Seconds a confirmed model is trusted before checking availability again
+MODEL_READY_TTL = 300.0
+# Seconds the list of installed models is reused
+MODEL_LIST_TTL = 60.0
+# How long ollama keeps the model loaded after the last request
+DEFAULT_KEEP_ALIVE = "30m"
+DEFAULT_NUM_CTX = 4096
+OLLAMA_NOT_RUNNING = "Error: Ollama service is not running. Please start ollama first."
+
+_RE_JSON_BLOCK = re.compile(r'[\[{].*[\]}]', re.DOTALL)
+
+def parse_json_response(response: str) -> Optional[Any]:
+    """Parse JSON from an LLM response, tolerating prose around the payload"""
+    if not isinstance(response, str):
+        return None
+    try:
+        return orjson.loads(response.encode())
+    except orjson.JSONDecodeError:
+        pass
+    
+    match = _RE_JSON_BLOCK.search(response)
+    if match:
+        try:
+            return orjson.loads(match.group(0).encode())
+        except orjson.JSONDecodeError:
+            pass
+    return None
+
 class RateLimiter:
-    def __init__(self, calls_per_second: int = 2):
+    """Token bucket allowing short bursts of up to `burst` calls at `calls_per_second`.
+
+    Used as an async context manager it also caps the number of requests in flight.
+    Each Streamlit session runs its own event loop in its own thread: the rate is
+    shared by all of them, the in-flight cap applies per event loop.
+    """
+    def __init__(self, calls_per_second: float = 2, burst: int = 4, max_inflight: int = 4):
         self.calls_per_second = calls_per_second
-        self.last_call = datetime.now()
+        self.burst = burst
+        self.max_inflight = max_inflight
+        self._tokens = float(burst)
+        self._last = time.monotonic()
+        # Guards the bucket across threads; never held across an await
+        self._lock = threading.Lock()
+        # Event loop -> in-flight semaphore, dropped once the loop is gone
+        self._semaphores = weakref.WeakKeyDictionary()
+    
+    def _semaphore(self) -> asyncio.Semaphore:
+        # Asyncio primitives are bound to an event loop, so keep one per running loop
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            semaphore = self._semaphores.get(loop)
+            if semaphore is None:
+                semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_inflight)
+        return semaphore
     
     async def wait(self):
-        now = datetime.now()
-        time_since_last = (now - self.last_call).total_seconds()
-        if time_since_last < (1.0 / self.calls_per_second):
-            wait_time = (1.0 / self.calls_per_second) - time_since_last
-            await asyncio.sleep(wait_time)
-        self.last_call = datetime.now()
+        # Reserve a token now and sleep off any deficit outside the lock
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.calls_per_second)
+            self._last = now
+            self._tokens -= 1
+            delay = -self._tokens / self.calls_per_second if self._tokens < 0 else 0.0
+        if delay:
+            await asyncio.sleep(delay)
+    
+    async def __aenter__(self):
+        await self.wait()
+        await self._semaphore().acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        self._semaphore().release()
+
+# One limiter per ollama server, shared by every LLMManager talking to it
+_rate_limiters: Dict[str, RateLimiter] = {}
+_rate_limiters_lock = threading.Lock()
+
+def get_rate_limiter(base_url: str, calls_per_second: float = 2, burst: int = 4,
+                     max_inflight: int = 4) -> RateLimiter:
+    with _rate_limiters_lock:
+        if base_url not in _rate_limiters:
+            _rate_limiters[base_url] = RateLimiter(calls_per_second, burst, max_inflight)
+        return _rate_limiters[base_url]
 
 class LLMManager:
     def __init__(self, config_path: str = "config/config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)['llm']
+        self.config = load_config(config_path)['llm']
         
         self.model = self.config['model']
         self.max_tokens = self.config['max_tokens']
-        self.rate_limiter = RateLimiter()
+        self.keep_alive = self.config.get('keep_alive', DEFAULT_KEEP_ALIVE)
+        self.num_ctx = self.config.get('num_ctx', DEFAULT_NUM_CTX)
+        self.base_url = self.config.get('base_url', OLLAMA_URL)
+        self.rate_limiter = get_rate_limiter(
+            self.base_url,
+            self.config.get('calls_per_second', 2),
+            self.config.get('burst', 4),
+            self.config.get('max_inflight', 4)
+        )
+        self._http = LoopBoundClient(lambda: httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(max_keepalive_connections=10),
+            timeout=httpx.Timeout(300.0, connect=5.0)
+        ))
+        self._model_ready = False
+        self._model_ready_at = 0.0
+        self._models_cache: Optional[List[str]] = None
+        self._models_cached_at = 0.0
         logger.info(f"Initialized LLMManager with model: {self.model}")
     
+    async def aclose(self):
+        """Close the shared ollama client"""
+        await self._http.aclose()
+
     async def _check_ollama_service(self) -> bool:
-        """Verify that ollama service is running and responding"""
+        """Verify that ollama service is running and responding.
+
+        Generation does not call this; an unreachable service surfaces as httpx.ConnectError.
+        """
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get("http://localhost:11434/", timeout=5.0)
-                return response.status_code == 200
+            client = self._http.get()
+            response = await client.get("/", timeout=5.0)
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"Ollama service check failed: {e}")
             return False
 
     async def _list_models(self) -> List[str]:
         """Get list of available models from ollama"""
+        if self._models_cache is not None and time.monotonic() - self._models_cached_at < MODEL_LIST_TTL:
+            return self._models_cache
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get("http://localhost:11434/api/tags")
-                if response.status_code == 200:
-                    data = response.json()
-                    return [model['name'] for model in data.get('models', [])]
-                return []
+            client = self._http.get()
+            response = await client.get("/api/tags")
+            if response.status_code == 200:
+                data = response.json()
+                self._models_cache = [model['name'] for model in data.get('models', [])]
+                self._models_cached_at = time.monotonic()
+                return self._models_cache
+            return []
+        except httpx.ConnectError:
+            raise
         except Exception as e:
             logger.error(f"Failed to list models: {e}")
             return []
 
     async def ensure_model_loaded(self, max_retries: int = 3) -> bool:
         """Ensure the model is loaded and ready to use"""
-        if not await self._check_ollama_service():
-            logger.error("Ollama service is not running")
-            return False
-            
+        if self._model_ready and time.monotonic() - self._model_ready_at < MODEL_READY_TTL:
+            return True
+        
         for attempt in range(max_retries):
             try:
                 logger.info(f"Checking if model {self.model} is loaded (attempt {attempt + 1}/{max_retries})")
@@ -77,13 +182,21 @@ class LLMManager:
                 
                 if model_name in available_models:
                     logger.info(f"Model {self.model} is available")
+                    self._mark_model_ready()
                     return True
                 
                 # If model not found, try to pull it
                 logger.warning(f"Model {self.model} not found, attempting to pull...")
-                await self._pull_model()
+                pulled = await self._pull_model()
+                self._models_cache = None
+                if not (pulled and await self._preload_model()):
+                    # Retried below; a failed pull must not be cached as ready
+                    raise Exception(f"Failed to pull model {self.model}")
+                self._mark_model_ready()
                 return True
                 
+            except httpx.ConnectError:
+                raise
             except Exception as e:
                 logger.error(f"Error checking/pulling model: {str(e)}")
                 if attempt < max_retries - 1:
@@ -91,64 +204,119 @@ class LLMManager:
                 continue
         return False
 
+    def _mark_model_ready(self):
+        self._model_ready = True
+        self._model_ready_at = time.monotonic()
+
     async def _pull_model(self) -> bool:
         """Pull the model from ollama"""
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "http://localhost:11434/api/pull",
-                    json={"name": self.model},
-                    timeout=300.0  # 5 minutes timeout for model pulling
-                )
-                return response.status_code == 200
+            client = self._http.get()
+            response = await client.post(
+                "/api/pull",
+                json={"name": self.model},
+                timeout=300.0  # 5 minutes timeout for model pulling
+            )
+            return response.status_code == 200
         except Exception as e:
             logger.error(f"Failed to pull model: {e}")
             return False
 
-    async def generate_response(self, prompt: str) -> str:
-        # Rate limit our requests
-        await self.rate_limiter.wait()
-        
-        if not await self._check_ollama_service():
-            error_msg = "Error: Ollama service is not running. Please start ollama first."
-            logger.error(error_msg)
-            return error_msg
-        
-        # Ensure model is loaded
+    async def _preload_model(self) -> bool:
+        """Load the model into memory so the first generation does not pay the load cost"""
+        try:
+            client = self._http.get()
+            response = await client.post(
+                "/api/generate",
+                content=orjson.dumps({
+                    "model": self.model,
+                    "prompt": "",
+                    "keep_alive": self.keep_alive
+                }),
+                headers=JSON_HEADERS
+            )
+            return response.status_code == 200
+        except Exception as e:
+            logger.error(f"Failed to preload model: {e}")
+            return False
+
+    async def _prepare_generation(self) -> Optional[str]:
+        """Run the pre-flight checks, returning an error message if generation cannot proceed"""
+        # Ensure model is loaded (cached; an unreachable service raises httpx.ConnectError)
         if not await self.ensure_model_loaded():
             error_msg = f"Error: Failed to load model {self.model}"
             logger.error(error_msg)
             return error_msg
-            
+        return None
+
+    async def generate_response(self, prompt: str, expect_json: bool = False) -> str:
+        """Generate a full response by collecting the streamed chunks"""
+        return "".join([chunk async for chunk in self.stream_response(prompt, expect_json)])
+
+    async def stream_response(self, prompt: str, expect_json: bool = False) -> AsyncIterator[str]:
+        """Yield response chunks from ollama as they are generated.
+
+        With expect_json, ollama constrains the output to valid JSON.
+        """
         try:
-            logger.debug(f"Generating response with model {self.model}")
-            options = {
-                "num_predict": self.max_tokens,
-            }
-            
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    "http://localhost:11434/api/generate",
-                    json={
-                        "model": self.model,
-                        "prompt": prompt,
-                        "options": options
-                    }
-                )
+            # Rate limit our requests and hold an in-flight slot for the whole stream
+            async with self.rate_limiter:
+                error_msg = await self._prepare_generation()
+                if error_msg:
+                    yield error_msg
+                    return
                 
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get('response', '')
-                else:
-                    raise Exception(f"Ollama API error: {response.status_code}")
+                logger.debug(f"Streaming response with model {self.model}")
+                options = {
+                    "num_predict": self.max_tokens,
+                    "num_ctx": self.num_ctx
+                }
+                
+                payload = {
+                    "model": self.model,
+                    "prompt": prompt,
+                    "options": options,
+                    "keep_alive": self.keep_alive,
+                    "stream": True
+                }
+                if expect_json:
+                    payload["format"] = "json"
+                
+                client = self._http.get()
+                async with client.stream(
+                    "POST",
+                    "/api/generate",
+                    content=orjson.dumps(payload),
+                    headers=JSON_HEADERS
+                ) as response:
+                    if response.status_code != 200:
+                        raise Exception(f"Ollama API error: {response.status_code}")
+                
+                    async for line in response.aiter_lines():
+                        if not line:
+                            continue
+                        data = orjson.loads(line)
+                        if data.get('response'):
+                            yield data['response']
+                        if data.get('done'):
+                            break
                     
+        except httpx.ConnectError:
+            # Re-check the model once the service is back
+            self._model_ready = False
+            logger.error(OLLAMA_NOT_RUNNING)
+            yield OLLAMA_NOT_RUNNING
         except Exception as e:
             error_msg = f"Error generating response: {str(e)}"
             logger.error(error_msg, exc_info=True)
-            return error_msg
+            yield error_msg
 
-    async def analyze_text(self, text: str, task: str) -> Dict[str, Any]:
+    async def analyze_text(self, text: str, task: str, expect_json: bool = True) -> Dict[str, Any]:
         logger.debug(f"Analyzing text for task: {task}")
         prompt = f"Task: {task}\n\nText to analyze: {text}"
-        response = await self.generate_response(prompt)
+        response = await self.generate_response(prompt, expect_json=expect_json)
+        if expect_json:
+            data = parse_json_response(response)
+            if isinstance(data, dict):
+                return data
         return {"analysis": response}
\ No newline at end of file
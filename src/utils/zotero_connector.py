@@ -1,11 +1,83 @@
 from pyzotero import zotero
-import yaml
+from src.utils.config import load_config
+from src.utils.async_client import LoopBoundClient
 from typing import Dict, List, Optional
+import asyncio
+import copy
+import httpx
+import orjson
+
+ZOTERO_API_URL = "https://api.zotero.org"
+# Maximum number of items per Zotero write request
+ZOTERO_WRITE_BATCH = 50
+# Largest page size the Zotero API accepts for read requests
+ZOTERO_PAGE_LIMIT = 100
+
+# Static copy of GET /items/new?itemType=journalArticle, used when the API is unreachable
+JOURNAL_ARTICLE_TEMPLATE: Dict = {
+    'itemType': 'journalArticle',
+    'title': '',
+    'creators': [{'creatorType': 'author', 'firstName': '', 'lastName': ''}],
+    'abstractNote': '',
+    'publicationTitle': '',
+    'volume': '',
+    'issue': '',
+    'pages': '',
+    'date': '',
+    'series': '',
+    'seriesTitle': '',
+    'seriesText': '',
+    'journalAbbreviation': '',
+    'language': '',
+    'DOI': '',
+    'ISSN': '',
+    'shortTitle': '',
+    'url': '',
+    'accessDate': '',
+    'archive': '',
+    'archiveLocation': '',
+    'libraryCatalog': '',
+    'callNumber': '',
+    'rights': '',
+    'extra': '',
+    'tags': [],
+    'collections': [],
+    'relations': {}
+}
+
+def _align_created(response: Dict, count: int) -> List[Dict]:
+    """Map a create_items response back onto the positions of the submitted items"""
+    successful = response.get('successful', {}) if isinstance(response, dict) else {}
+    failed = response.get('failed', {}) if isinstance(response, dict) else {}
+    results = []
+    for position in range(count):
+        created = successful.get(str(position))
+        if created:
+            results.append(created)
+        else:
+            failure = failed.get(str(position), {})
+            results.append({'error': failure.get('message', "Zotero did not accept the item")})
+    return results
+
+def _chunked(templates: List[Dict]) -> List[List[Dict]]:
+    """Split item payloads into write requests of at most ZOTERO_WRITE_BATCH items"""
+    return [templates[start:start + ZOTERO_WRITE_BATCH]
+            for start in range(0, len(templates), ZOTERO_WRITE_BATCH)]
+
+def _align_batches(chunks: List[List[Dict]], responses: List) -> List[Dict]:
+    """Flatten per-chunk create_items responses (or exceptions) into one aligned result list"""
+    results = []
+    for chunk, response in zip(chunks, responses):
+        if isinstance(response, Exception):
+            print(f"Error creating Zotero items: {response}")
+            results.extend({'error': str(response)} for _ in chunk)
+        else:
+            results.extend(_align_created(response, len(chunk)))
+    return results
 
 class ZoteroConnector:
     def __init__(self, config_path: str = "config/config.yaml"):
-        with open(config_path, 'r') as f:
-            self.config = yaml.safe_load(f)['zotero']
+        self.config = load_config(config_path)['zotero']
         
         self.zot = zotero.Zotero(
             library_id=self.config['library_id'],
@@ -14,40 +86,63 @@ class ZoteroConnector:
         )
         self.collection_name = self.config['collection_name']
         self.auto_tags = self.config['auto_tags']
+        # Payloads are only serialized, so the default tag list can be shared between them
+        self._auto_tag_dicts = [{'tag': tag} for tag in self.auto_tags]
+        self._journal_template: Optional[Dict] = None
 
-    def create_item(self, title: str, abstract: str, url: str, tags: Optional[List[str]] = None) -> Dict:
-        if tags is None:
-            tags = self.auto_tags
+    def journal_template(self) -> Dict:
+        """The journalArticle template, fetched from Zotero once and reused.
+
+        Callers must copy it before filling it in.
+        """
+        if self._journal_template is None:
+            try:
+                self._journal_template = self.zot.item_template('journalArticle')
+            except Exception as e:
+                print(f"Error fetching Zotero item template, using the built-in one: {e}")
+                return JOURNAL_ARTICLE_TEMPLATE
+        return self._journal_template
+
+    def build_item(self, title: str, abstract: str, url: str, tags: Optional[List[str]] = None,
+                   template: Optional[Dict] = None) -> Dict:
+        """Build a journalArticle payload ready to be passed to create_items"""
+        template = copy.deepcopy(self.journal_template() if template is None else template)
 
-        template = self.zot.item_template('journalArticle')
         template['title'] = title
         template['abstractNote'] = abstract
         template['url'] = url
-        template['tags'] = [{'tag': tag} for tag in tags]
-
-        try:
-            result = self.zot.create_items([template])
-            if not result or not isinstance(result, list):
-                raise ValueError("Failed to create Zotero item: API returned empty or invalid response")
-            return result[0]['data']
-        except Exception as e:
-            print(f"Error creating Zotero item: {e}")
-            print(f"Template data: {template}")
-            raise
-
-    def get_collection_items(self, collection_name: Optional[str] = None) -> List[Dict]:
-        if collection_name is None:
-            collection_name = self.collection_name
-        
-        collections = self.zot.collections()
-        target_collection = next(
-            (c for c in collections if c['data']['name'] == collection_name),
-            None
-        )
-        
-        if target_collection:
-            return self.zot.collection_items(target_collection['key'])
-        return []
+        template['tags'] = self._auto_tag_dicts if tags is None else [{'tag': tag} for tag in tags]
+        return template
+
+    def build_items(self, items: List[Dict]) -> List[Dict]:
+        """Build one payload per entry of build_item arguments, fetching the template once"""
+        template = self.journal_template()
+        return [self.build_item(template=template, **item) for item in items]
+
+    def create_items_batch(self, items: List[Dict]) -> List[Dict]:
+        """Create many items with as few write requests as possible.
+
+        Each entry in items holds the build_item arguments. The result is aligned
+        with items: created entries carry the new 'key' and 'data', failed ones an
+        'error' message.
+        """
+        chunks = _chunked(self.build_items(items))
+        responses = []
+        for chunk in chunks:
+            try:
+                responses.append(self.zot.create_items(chunk))
+            except Exception as e:
+                responses.append(e)
+        return _align_batches(chunks, responses)
+
+    def create_item(self, title: str, abstract: str, url: str, tags: Optional[List[str]] = None) -> Dict:
+        result = self.create_items_batch([
+            {'title': title, 'abstract': abstract, 'url': url, 'tags': tags}
+        ])[0]
+        if 'error' in result:
+            print(f"Error creating Zotero item: {result['error']}")
+            raise ValueError(f"Failed to create Zotero item: {result['error']}")
+        return result['data']
 
     def search_items(self, query: str) -> List[Dict]:
         return self.zot.items(q=query)
@@ -55,6 +150,93 @@ class ZoteroConnector:
     def add_tags(self, item_key: str, tags: List[str]):
         current = self.zot.item(item_key)
         current_tags = current['data'].get('tags', [])
-        new_tags = [{'tag': tag} for tag in tags]
+        # Only send tags the item does not have yet
+        seen = {t['tag'] for t in current_tags}
+        new_tags = []
+        for tag in tags:
+            if tag not in seen:
+                seen.add(tag)
+                new_tags.append({'tag': tag})
         current['data']['tags'] = current_tags + new_tags
-        self.zot.update_item(current)
\ No newline at end of file
+        self.zot.update_item(current)
+
+class AsyncZoteroConnector:
+    """Async client for the hot Zotero Web API calls, with pooled HTTP/2 connections.
+
+    Item payloads still come from ZoteroConnector.build_items.
+    """
+    def __init__(self, config_path: str = "config/config.yaml"):
+        self.config = load_config(config_path)['zotero']
+        
+        self.base_url = f"{ZOTERO_API_URL}/{self.config['library_type']}s/{self.config['library_id']}"
+        self.headers = {
+            "Zotero-API-Key": self.config['api_key'],
+            "Zotero-API-Version": "3",
+            "Content-Type": "application/json"
+        }
+        self.collection_name = self.config['collection_name']
+        self._http = LoopBoundClient(lambda: httpx.AsyncClient(
+            base_url=self.base_url,
+            headers=self.headers,
+            http2=True,
+            timeout=30.0
+        ))
+        self._collection_key_cache: Dict[str, str] = {}
+
+    async def aclose(self):
+        """Close the shared Zotero client"""
+        await self._http.aclose()
+
+    async def create_items(self, templates: List[Dict]) -> Dict:
+        """Send one write request, returning Zotero's successful/failed response"""
+        client = self._http.get()
+        response = await client.post("/items", content=orjson.dumps(templates))
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
+    async def create_items_batch(self, templates: List[Dict]) -> List[Dict]:
+        """Create built item payloads, sending the write requests concurrently.
+
+        The result is aligned with templates like ZoteroConnector.create_items_batch.
+        """
+        chunks = _chunked(templates)
+        responses = await asyncio.gather(
+            *(self.create_items(chunk) for chunk in chunks),
+            return_exceptions=True
+        )
+        return _align_batches(chunks, responses)
+
+    async def _get_all(self, path: str) -> List[Dict]:
+        """GET every page of a Zotero list endpoint"""
+        client = self._http.get()
+        results: List[Dict] = []
+        while True:
+            response = await client.get(path, params={"limit": ZOTERO_PAGE_LIMIT, "start": len(results)})
+            response.raise_for_status()
+            page = orjson.loads(response.content)
+            results.extend(page)
+            if len(page) < ZOTERO_PAGE_LIMIT:
+                return results
+
+    async def collections(self) -> List[Dict]:
+        return await self._get_all("/collections")
+
+    async def collection_items(self, collection_key: str) -> List[Dict]:
+        return await self._get_all(f"/collections/{collection_key}/items")
+
+    async def get_collection_items(self, collection_name: Optional[str] = None) -> List[Dict]:
+        if collection_name is None:
+            collection_name = self.collection_name
+        
+        collection_key = await self._collection_key(collection_name)
+        if collection_key:
+            return await self.collection_items(collection_key)
+        return []
+
+    async def _collection_key(self, collection_name: str) -> Optional[str]:
+        """Resolve a collection name to its key, refetching collections only on a miss"""
+        key = self._collection_key_cache.get(collection_name)
+        if key is None:
+            self._collection_key_cache = {c['data']['name']: c['key'] for c in await self.collections()}
+            key = self._collection_key_cache.get(collection_name)
+        return key